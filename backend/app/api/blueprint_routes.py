@@ -45,7 +45,7 @@ async def generate_blueprint(
         )
         
         # Generate blueprint
-        blueprint = blueprint_generator.generate_blueprint(project_input)
+        blueprint = await blueprint_generator.generate_blueprint(project_input)
         
         # If Arabic requested, translate (you'd implement translation here)
         if preferred_language == "Arabic":
@@ -1,8 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import logging
-from .api.blueprint_routes import router as blueprint_router
+from .api.blueprint_routes import router as blueprint_router, blueprint_generator
 from .config.settings import get_settings
 
 # Configure logging
@@ -30,10 +31,53 @@ app.add_middleware(
 # Include routers
 app.include_router(blueprint_router)
 
+# Interval between flushes of buffered blueprint cache writes
+CACHE_FLUSH_INTERVAL = 2.0
+# Interval between deletions of expired blueprint cache entries
+CACHE_PRUNE_INTERVAL = 3600.0
+_cache_flush_task = None
+_chroma_connect_task = None
+_embedding_warmup_task = None
+
+async def flush_blueprint_cache():
+    """Write buffered blueprint cache entries to ChromaDB and prune expired ones
+    
+    Flushes every interval, or as soon as the buffer fills up.
+    """
+    loop = asyncio.get_running_loop()
+    next_prune = loop.time()
+    flush_requested = blueprint_generator.chroma.cache_flush_requested
+    while True:
+        try:
+            await asyncio.wait_for(flush_requested.wait(), CACHE_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        flush_requested.clear()
+        await asyncio.to_thread(blueprint_generator.chroma.flush_cache_writes)
+        if loop.time() >= next_prune:
+            await asyncio.to_thread(blueprint_generator.chroma.prune_cache)
+            next_prune = loop.time() + CACHE_PRUNE_INTERVAL
+
 @app.on_event("startup")
 async def startup_event():
+    global _cache_flush_task, _chroma_connect_task, _embedding_warmup_task
     logger.info("Starting Topsdraw Blueprint Generator...")
     # Initialize services, run migrations, etc.
+    if blueprint_generator is not None:
+        # Warm the ChromaDB connection and embedding model without delaying startup
+        _chroma_connect_task = asyncio.create_task(
+            asyncio.to_thread(blueprint_generator.chroma.connect)
+        )
+        _embedding_warmup_task = asyncio.create_task(
+            asyncio.to_thread(blueprint_generator.chroma.warm_embeddings)
+        )
+        _cache_flush_task = asyncio.create_task(flush_blueprint_cache())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _cache_flush_task is not None:
+        _cache_flush_task.cancel()
+        await asyncio.to_thread(blueprint_generator.chroma.flush_cache_writes)
 
 @app.get("/")
 async def root():
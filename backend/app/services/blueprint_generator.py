@@ -1,7 +1,9 @@
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set, Tuple
 from datetime import datetime
 import json
+import re
+from pydantic import ValidationError
 from ..models.schemas import (
     ProjectInputSchema, BlueprintSchema, ProjectPhaseSchema,
     ServiceLineSchema, AgencyMatchSchema
@@ -11,26 +13,126 @@ from .chroma_service import ChromaService
 
 logger = logging.getLogger(__name__)
 
+# Business keywords looked up in the project description. The lookahead
+# reports overlapping matches, so results match plain substring checks.
+BUSINESS_KEYWORDS = re.compile(
+    r'(?=(glamping|camping|perfume|fragrance|app|platform|software|restaurant|'
+    r'food|fine dining|dining|resort|luxury|enterprise))'
+)
+
+# Specialist agency categories per business type, with their strength keywords
+AGENCY_SPECIALIZATIONS = {
+    "glamping": {
+        "Sustainable Architecture Firms": ["eco-design", "sustainable", "architecture"],
+        "Hospitality Consultants": ["hospitality", "tourism", "experience"],
+        "Environmental Consultants": ["environmental", "sustainability", "permits"],
+        "Desert Experience Operators": ["tourism", "adventure", "activities"],
+        "Luxury Marketing Agencies": ["luxury", "pr", "marketing"]
+    },
+    "perfume": {
+        "Fragrance Houses": ["fragrance", "perfume", "cosmetics"],
+        "Luxury Brand Consultants": ["luxury", "brand", "premium"],
+        "Packaging Design Studios": ["packaging", "design", "luxury"],
+        "Retail Distribution Partners": ["retail", "distribution", "luxury"],
+        "E-commerce Specialists": ["ecommerce", "online", "digital"]
+    },
+    "tech": {
+        "App Development Studios": ["mobile", "app", "development"],
+        "UX/UI Design Agencies": ["design", "ux", "ui"],
+        "Cloud Infrastructure Partners": ["cloud", "aws", "infrastructure"],
+        "Digital Marketing Agencies": ["marketing", "growth", "digital"],
+        "QA Testing Companies": ["testing", "qa", "quality"]
+    }
+}
+
+STRENGTH_TEMPLATES = {
+    "eco": ["Sustainable practices", "Environmental expertise", "Green certifications"],
+    "luxury": ["Premium brand experience", "High-end clientele", "Luxury market knowledge"],
+    "tech": ["Cutting-edge technology", "Agile development", "Scalable solutions"],
+    "design": ["Award-winning designs", "Creative excellence", "User-centered approach"],
+    "marketing": ["ROI-focused campaigns", "Multi-channel expertise", "Data-driven strategies"]
+}
+
+# Known competitors per business category
+COMPETITOR_DATA = {
+    "glamping": [
+        {"name": "Sonara Camp", "location": "Dubai, UAE", "type": "Direct", "website": "sonaracamp.com"},
+        {"name": "Al Maha Resort", "location": "Dubai, UAE", "type": "Direct", "website": "marriott.com"},
+        {"name": "Qasr Al Sarab", "location": "Abu Dhabi, UAE", "type": "Adjacent", "website": "anantara.com"}
+    ],
+    "perfume": [
+        {"name": "Swiss Arabian", "location": "Dubai, UAE", "type": "Direct", "website": "swissarabian.com"},
+        {"name": "Ajmal Perfumes", "location": "Dubai, UAE", "type": "Direct", "website": "ajmalperfume.com"},
+        {"name": "Rasasi", "location": "Dubai, UAE", "type": "Adjacent", "website": "rasasi.com"}
+    ],
+    "restaurant": [
+        {"name": "Zuma", "location": "Dubai, UAE", "type": "Direct", "website": "zumarestaurant.com"},
+        {"name": "La Petite Maison", "location": "Dubai, UAE", "type": "Direct", "website": "lpm-restaurants.com"},
+        {"name": "Nobu", "location": "Dubai, UAE", "type": "Adjacent", "website": "noburestaurants.com"}
+    ],
+    "tech": [
+        {"name": "Careem", "location": "Dubai, UAE", "type": "Adjacent", "website": "careem.com"},
+        {"name": "Talabat", "location": "Dubai, UAE", "type": "Adjacent", "website": "talabat.com"},
+        {"name": "Noon", "location": "Dubai, UAE", "type": "Adjacent", "website": "noon.com"}
+    ]
+}
+
+DEFAULT_COMPETITORS = [
+    {"name": "Market Leader A", "location": "Dubai, UAE", "type": "Direct", "website": "example.com"},
+    {"name": "Established Player B", "location": "Abu Dhabi, UAE", "type": "Direct", "website": "example.com"},
+    {"name": "Innovation Company C", "location": "UAE", "type": "Adjacent", "website": "example.com"}
+]
+
+# Budget ranges for the form's budget choices and the analysed budget tier
+BUDGET_MAP = {
+    "30-60k": "AED 30,000 - 60,000",
+    "60-120k": "AED 60,000 - 120,000",
+    "120-200k": "AED 120,000 - 200,000",
+    "200-500k": "AED 200,000 - 500,000",
+    "500k+": "AED 500,000+"
+}
+
+TIER_MAP = {
+    "Starter": "AED 50,000 - 150,000",
+    "Growth": "AED 150,000 - 500,000",
+    "Enterprise": "AED 500,000+"
+}
+
 class BlueprintGenerator:
     def __init__(self):
         self.gemini = GeminiService()
         self.chroma = ChromaService()
     
-    def generate_blueprint(self, project_input: ProjectInputSchema) -> BlueprintSchema:
+    async def generate_blueprint(self, project_input: ProjectInputSchema) -> BlueprintSchema:
         """Generate complete project blueprint"""
         
-        # Step 1: Analyze project idea with Gemini
-        project_analysis = self.gemini.analyze_project_idea(project_input)
+        # Reuse a blueprint generated for a semantically similar request
+        cache_text, cache_filters = self._build_cache_key(project_input)
+        cached = await self.chroma.find_cached_blueprint_async(cache_text, cache_filters)
+        if cached:
+            try:
+                blueprint = BlueprintSchema.model_validate_json(cached)
+                blueprint.generated_at = datetime.now()
+                return blueprint
+            except ValidationError as e:
+                # e.g. written by an older schema version; regenerate instead
+                logger.warning(f"Ignoring unreadable cached blueprint: {e}")
+        
+        # Step 1: Analyze project idea and generate creative suggestions with Gemini
+        project_analysis, creative_touches, from_gemini = await self.gemini.analyze_and_suggest(project_input)
+        
+        # Scan the description for business keywords once for all steps
+        desc_keywords = self._detect_keywords(project_input.description)
         
         # Step 2: Generate context-specific phases based on the actual business
         phases = self._generate_context_aware_phases(
-            project_input.description,
+            desc_keywords,
             project_analysis
         )
         
         # Step 3: Generate context-specific service recommendations
         service_recommendations = self._generate_context_aware_services(
-            project_input.description,
+            desc_keywords,
             project_analysis
         )
         
@@ -44,18 +146,15 @@ class BlueprintGenerator:
         agency_showcase = self._organize_agencies_by_actual_services(
             agencies, 
             project_analysis.get('required_services', []),
-            project_input.description
+            desc_keywords
         )
         
-        # Step 6: Generate creative suggestions specific to this business
-        creative_touches = self.gemini.generate_creative_suggestions(project_analysis)
-        
-        # Step 7: Find relevant competitors
+        # Step 6: Find relevant competitors
         competitors = self._find_context_aware_competitors(project_analysis)
         
-        # Step 8: Generate context-specific next steps
+        # Step 7: Generate context-specific next steps
         next_steps = self._generate_context_aware_next_steps(
-            project_input.description,
+            desc_keywords,
             project_analysis
         )
         
@@ -66,7 +165,9 @@ class BlueprintGenerator:
             target_market=project_analysis.get('target_market', ''),
             launch_mode=project_analysis.get('launch_mode', 'Hybrid'),
             timeline=project_analysis.get('recommended_timeline', '12 weeks'),
-            budget_estimate=self._estimate_context_aware_budget(project_analysis, project_input),
+            budget_estimate=self._estimate_context_aware_budget(
+                project_analysis, project_input, desc_keywords
+            ),
             phases=phases,
             service_recommendations=service_recommendations,
             agency_showcase=agency_showcase,
@@ -76,16 +177,32 @@ class BlueprintGenerator:
             generated_at=datetime.now()
         )
         
+        # Only cache real generations; canned fallbacks must not outlive an outage
+        if from_gemini:
+            self.chroma.cache_blueprint(cache_text, cache_filters, blueprint.model_dump_json())
+        
         return blueprint
     
-    def _generate_context_aware_phases(self, description: str, analysis: Dict) -> List[ProjectPhaseSchema]:
+    def _build_cache_key(self, project_input: ProjectInputSchema) -> Tuple[str, Dict[str, str]]:
+        """Split the input into the description, matched semantically, and the
+        structured fields a cached blueprint must match exactly"""
+        filters = {
+            "business_type": (project_input.business_type or 'general').strip().lower(),
+            "launch_location": (project_input.launch_location or '').strip().lower(),
+            "budget": (project_input.budget or 'flexible').strip().lower(),
+            "timeline": (project_input.timeline or 'flexible').strip().lower()
+        }
+        return project_input.description, filters
+    
+    def _detect_keywords(self, description: str) -> Set[str]:
+        """Return the business keywords found in the description in a single scan"""
+        return {match.group(1) for match in BUSINESS_KEYWORDS.finditer(description.lower())}
+    
+    def _generate_context_aware_phases(self, desc_keywords: Set[str], analysis: Dict) -> List[ProjectPhaseSchema]:
         """Generate phases specific to the business type"""
         
-        desc_lower = description.lower()
-        business_category = analysis.get('business_category', '').lower()
-        
         # Eco-luxury glamping specific phases
-        if 'glamping' in desc_lower or 'camping' in desc_lower:
+        if {'glamping', 'camping'} & desc_keywords:
             return [
                 ProjectPhaseSchema(
                     phase_name="Site Selection & Environmental Assessment",
@@ -175,7 +292,7 @@ class BlueprintGenerator:
             ]
         
         # Perfume brand specific phases
-        elif 'perfume' in desc_lower or 'fragrance' in desc_lower:
+        elif {'perfume', 'fragrance'} & desc_keywords:
             return [
                 ProjectPhaseSchema(
                     phase_name="Brand Concept & Fragrance Development",
@@ -265,7 +382,7 @@ class BlueprintGenerator:
             ]
         
         # Tech/App specific phases
-        elif 'app' in desc_lower or 'platform' in desc_lower or 'software' in desc_lower:
+        elif {'app', 'platform', 'software'} & desc_keywords:
             return [
                 ProjectPhaseSchema(
                     phase_name="Discovery & Market Research",
@@ -355,7 +472,7 @@ class BlueprintGenerator:
             ]
         
         # Restaurant specific phases
-        elif 'restaurant' in desc_lower or 'food' in desc_lower or 'dining' in desc_lower:
+        elif {'restaurant', 'food', 'dining'} & desc_keywords:
             return [
                 ProjectPhaseSchema(
                     phase_name="Concept Development & Menu Design",
@@ -448,15 +565,14 @@ class BlueprintGenerator:
         else:
             return self._build_default_phases(analysis)
     
-    def _generate_context_aware_services(self, description: str, 
+    def _generate_context_aware_services(self, desc_keywords: Set[str], 
                                         analysis: Dict) -> List[ServiceLineSchema]:
         """Generate service recommendations specific to the business"""
         
-        desc_lower = description.lower()
         services = []
         
         # Glamping specific services
-        if 'glamping' in desc_lower or 'camping' in desc_lower:
+        if {'glamping', 'camping'} & desc_keywords:
             services = [
                 ServiceLineSchema(
                     name="Sustainable Architecture & Design",
@@ -496,7 +612,7 @@ class BlueprintGenerator:
             ]
         
         # Perfume specific services
-        elif 'perfume' in desc_lower or 'fragrance' in desc_lower:
+        elif {'perfume', 'fragrance'} & desc_keywords:
             services = [
                 ServiceLineSchema(
                     name="Fragrance Development",
@@ -536,7 +652,7 @@ class BlueprintGenerator:
             ]
         
         # Tech/App specific services
-        elif 'app' in desc_lower or 'platform' in desc_lower:
+        elif {'app', 'platform'} & desc_keywords:
             services = [
                 ServiceLineSchema(
                     name="Mobile App Development",
@@ -591,58 +707,33 @@ class BlueprintGenerator:
     
     def _organize_agencies_by_actual_services(self, agencies: List[Dict], 
                                              services: List[str],
-                                             description: str) -> Dict[str, List[AgencyMatchSchema]]:
+                                             desc_keywords: Set[str]) -> Dict[str, List[AgencyMatchSchema]]:
         """Organize agencies by the actual services needed"""
         
-        desc_lower = description.lower()
         showcase = {}
         
-        # Map generic agencies to specific service needs
-        agency_specializations = {
-            "glamping": {
-                "Sustainable Architecture Firms": ["eco-design", "sustainable", "architecture"],
-                "Hospitality Consultants": ["hospitality", "tourism", "experience"],
-                "Environmental Consultants": ["environmental", "sustainability", "permits"],
-                "Desert Experience Operators": ["tourism", "adventure", "activities"],
-                "Luxury Marketing Agencies": ["luxury", "pr", "marketing"]
-            },
-            "perfume": {
-                "Fragrance Houses": ["fragrance", "perfume", "cosmetics"],
-                "Luxury Brand Consultants": ["luxury", "brand", "premium"],
-                "Packaging Design Studios": ["packaging", "design", "luxury"],
-                "Retail Distribution Partners": ["retail", "distribution", "luxury"],
-                "E-commerce Specialists": ["ecommerce", "online", "digital"]
-            },
-            "tech": {
-                "App Development Studios": ["mobile", "app", "development"],
-                "UX/UI Design Agencies": ["design", "ux", "ui"],
-                "Cloud Infrastructure Partners": ["cloud", "aws", "infrastructure"],
-                "Digital Marketing Agencies": ["marketing", "growth", "digital"],
-                "QA Testing Companies": ["testing", "qa", "quality"]
-            }
-        }
-        
         # Determine business type
         business_type = "general"
-        if 'glamping' in desc_lower:
+        if 'glamping' in desc_keywords:
             business_type = "glamping"
-        elif 'perfume' in desc_lower or 'fragrance' in desc_lower:
+        elif {'perfume', 'fragrance'} & desc_keywords:
             business_type = "perfume"
-        elif 'app' in desc_lower or 'platform' in desc_lower:
+        elif {'app', 'platform'} & desc_keywords:
             business_type = "tech"
         
         # Get specialized categories
-        categories = agency_specializations.get(business_type, {})
+        categories = AGENCY_SPECIALIZATIONS.get(business_type, {})
         
         if categories:
             for category_name, keywords in categories.items():
                 category_agencies = []
+                strengths = self._customize_strengths(keywords)
                 for agency in agencies[:3]:  # Top 3 per category
                     # Customize agency description based on category
                     category_agencies.append(AgencyMatchSchema(
                         name=f"{agency.get('name', 'Agency')} - {category_name.split()[0]}",
                         match_fit_score=agency.get('match_fit_score', 0.8),
-                        key_strengths=self._customize_strengths(keywords),
+                        key_strengths=strengths,
                         relevant_experience=f"Specialized in {category_name.lower()}",
                         availability=agency.get('availability', 'Immediate'),
                         why_consider=f"Expert in {category_name.lower()} with proven track record"
@@ -667,17 +758,9 @@ class BlueprintGenerator:
     
     def _customize_strengths(self, keywords: List[str]) -> List[str]:
         """Generate customized strengths based on keywords"""
-        strength_templates = {
-            "eco": ["Sustainable practices", "Environmental expertise", "Green certifications"],
-            "luxury": ["Premium brand experience", "High-end clientele", "Luxury market knowledge"],
-            "tech": ["Cutting-edge technology", "Agile development", "Scalable solutions"],
-            "design": ["Award-winning designs", "Creative excellence", "User-centered approach"],
-            "marketing": ["ROI-focused campaigns", "Multi-channel expertise", "Data-driven strategies"]
-        }
-        
         strengths = []
         for keyword in keywords:
-            for key, values in strength_templates.items():
+            for key, values in STRENGTH_TEMPLATES.items():
                 if key in keyword:
                     strengths.extend(values)
                     break
@@ -688,49 +771,22 @@ class BlueprintGenerator:
         """Find competitors relevant to the specific business"""
         
         business_category = analysis.get('business_category', '').lower()
-        
-        competitor_data = {
-            "glamping": [
-                {"name": "Sonara Camp", "location": "Dubai, UAE", "type": "Direct", "website": "sonaracamp.com"},
-                {"name": "Al Maha Resort", "location": "Dubai, UAE", "type": "Direct", "website": "marriott.com"},
-                {"name": "Qasr Al Sarab", "location": "Abu Dhabi, UAE", "type": "Adjacent", "website": "anantara.com"}
-            ],
-            "perfume": [
-                {"name": "Swiss Arabian", "location": "Dubai, UAE", "type": "Direct", "website": "swissarabian.com"},
-                {"name": "Ajmal Perfumes", "location": "Dubai, UAE", "type": "Direct", "website": "ajmalperfume.com"},
-                {"name": "Rasasi", "location": "Dubai, UAE", "type": "Adjacent", "website": "rasasi.com"}
-            ],
-            "restaurant": [
-                {"name": "Zuma", "location": "Dubai, UAE", "type": "Direct", "website": "zumarestaurant.com"},
-                {"name": "La Petite Maison", "location": "Dubai, UAE", "type": "Direct", "website": "lpm-restaurants.com"},
-                {"name": "Nobu", "location": "Dubai, UAE", "type": "Adjacent", "website": "noburestaurants.com"}
-            ],
-            "tech": [
-                {"name": "Careem", "location": "Dubai, UAE", "type": "Adjacent", "website": "careem.com"},
-                {"name": "Talabat", "location": "Dubai, UAE", "type": "Adjacent", "website": "talabat.com"},
-                {"name": "Noon", "location": "Dubai, UAE", "type": "Adjacent", "website": "noon.com"}
-            ]
-        }
+        project_name = analysis.get('project_name', '').lower()
         
         # Find matching category
-        for category, competitors in competitor_data.items():
-            if category in business_category or category in analysis.get('project_name', '').lower():
+        for category, competitors in COMPETITOR_DATA.items():
+            if category in business_category or category in project_name:
                 return competitors
         
         # Default competitors
-        return [
-            {"name": "Market Leader A", "location": "Dubai, UAE", "type": "Direct", "website": "example.com"},
-            {"name": "Established Player B", "location": "Abu Dhabi, UAE", "type": "Direct", "website": "example.com"},
-            {"name": "Innovation Company C", "location": "UAE", "type": "Adjacent", "website": "example.com"}
-        ]
+        return DEFAULT_COMPETITORS
     
-    def _generate_context_aware_next_steps(self, description: str, 
+    def _generate_context_aware_next_steps(self, desc_keywords: Set[str], 
                                           analysis: Dict) -> List[str]:
         """Generate next steps specific to the business"""
         
-        desc_lower = description.lower()
         
-        if 'glamping' in desc_lower:
+        if 'glamping' in desc_keywords:
             return [
                 "Schedule site visits to potential desert locations",
                 "Meet with environmental consultants for permit requirements",
@@ -739,7 +795,7 @@ class BlueprintGenerator:
                 "Connect with desert experience operators for partnerships",
                 "Develop detailed financial projections and funding plan"
             ]
-        elif 'perfume' in desc_lower or 'fragrance' in desc_lower:
+        elif {'perfume', 'fragrance'} & desc_keywords:
             return [
                 "Schedule meetings with perfumers and fragrance houses",
                 "Research luxury retail spaces in Dubai Mall and other premium locations",
@@ -748,7 +804,7 @@ class BlueprintGenerator:
                 "Explore ingredient sourcing, especially oud and local materials",
                 "Develop brand story and positioning strategy"
             ]
-        elif 'app' in desc_lower or 'platform' in desc_lower:
+        elif {'app', 'platform'} & desc_keywords:
             return [
                 "Conduct detailed user research and surveys",
                 "Interview potential development partners",
@@ -757,7 +813,7 @@ class BlueprintGenerator:
                 "Identify beta testing participants",
                 "Secure initial funding or investment"
             ]
-        elif 'restaurant' in desc_lower:
+        elif 'restaurant' in desc_keywords:
             return [
                 "Scout potential locations and negotiate lease terms",
                 "Interview executive chefs and develop signature menu",
@@ -777,60 +833,45 @@ class BlueprintGenerator:
             ]
     
     def _estimate_context_aware_budget(self, analysis: Dict, 
-                                      project_input: ProjectInputSchema) -> str:
+                                      project_input: ProjectInputSchema,
+                                      desc_keywords: Set[str]) -> str:
         """Estimate budget based on actual business requirements"""
         
-        business_category = analysis.get('business_category', '').lower()
-        desc_lower = project_input.description.lower()
-        
         # Glamping projects need higher investment
-        if 'glamping' in desc_lower or 'resort' in desc_lower:
+        if {'glamping', 'resort'} & desc_keywords:
             return "AED 1,500,000 - 3,000,000"
         
         # Luxury perfume brands
-        elif 'perfume' in desc_lower and 'luxury' in desc_lower:
+        elif 'perfume' in desc_keywords and 'luxury' in desc_keywords:
             return "AED 500,000 - 1,000,000"
         
         # Regular perfume brands
-        elif 'perfume' in desc_lower:
+        elif 'perfume' in desc_keywords:
             return "AED 200,000 - 500,000"
         
         # Restaurant projects
-        elif 'restaurant' in desc_lower:
-            if 'fine dining' in desc_lower or 'luxury' in desc_lower:
+        elif 'restaurant' in desc_keywords:
+            if {'fine dining', 'luxury'} & desc_keywords:
                 return "AED 800,000 - 1,500,000"
             else:
                 return "AED 400,000 - 800,000"
         
         # Tech projects
-        elif 'app' in desc_lower or 'platform' in desc_lower:
-            if 'enterprise' in desc_lower or 'complex' in analysis.get('estimated_complexity', '').lower():
+        elif {'app', 'platform'} & desc_keywords:
+            if 'enterprise' in desc_keywords or 'complex' in analysis.get('estimated_complexity', '').lower():
                 return "AED 300,000 - 600,000"
             else:
                 return "AED 100,000 - 300,000"
         
         # Use input budget if provided
         elif project_input.budget:
-            budget_map = {
-                "30-60k": "AED 30,000 - 60,000",
-                "60-120k": "AED 60,000 - 120,000",
-                "120-200k": "AED 120,000 - 200,000",
-                "200-500k": "AED 200,000 - 500,000",
-                "500k+": "AED 500,000+"
-            }
-            for key, value in budget_map.items():
+            for key, value in BUDGET_MAP.items():
                 if key in project_input.budget:
                     return value
         
         # Default based on tier
         budget_tier = analysis.get('budget_tier', 'Growth')
-        tier_map = {
-            "Starter": "AED 50,000 - 150,000",
-            "Growth": "AED 150,000 - 500,000",
-            "Enterprise": "AED 500,000+"
-        }
-        
-        return tier_map.get(budget_tier, "AED 100,000 - 300,000")
+        return TIER_MAP.get(budget_tier, "AED 100,000 - 300,000")
     
     def _build_default_phases(self, analysis: Dict) -> List[ProjectPhaseSchema]:
         """Build default phases when no specific template matches"""
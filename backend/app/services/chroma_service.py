@@ -1,47 +1,261 @@
+import asyncio
 import chromadb
+from chromadb.utils import embedding_functions
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
 import json
 import os
+import re
+import threading
 import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def get_chroma_client():
+    """Return the process-wide ChromaDB client, raising if it is unreachable"""
+    client = chromadb.HttpClient(
+        host=os.getenv("CHROMA_HOST", "localhost"),
+        port=int(os.getenv("CHROMA_PORT", "8000"))
+    )
+    # Test the connection; failures are not cached so the next call retries
+    client.heartbeat()
+    return client
+
+@lru_cache(maxsize=1)
+def get_embedding_function():
+    """Return the process-wide embedding function so model weights load once"""
+    providers = os.getenv("EMBEDDING_PROVIDERS")
+    if providers:
+        # e.g. CUDAExecutionProvider,CPUExecutionProvider to run MiniLM on the GPU
+        return embedding_functions.ONNXMiniLM_L6_V2(
+            preferred_providers=[p.strip() for p in providers.split(",") if p.strip()]
+        )
+    return embedding_functions.DefaultEmbeddingFunction()
+
+# HNSW settings for collections created at runtime; cache lookups only need the
+# nearest hit. Keep in sync with COLLECTION_METADATA in scripts/vectorize_agencies.py
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 32,
+    "hnsw:num_threads": 4
+}
+
+# Industry terms that route a project to a specialised agency category
+HOSPITALITY_TERMS = re.compile(r'eco|hospitality|resort|hotel|tourism')
+TECH_TERMS = re.compile(r'tech|software|app|digital')
+
+# Curated agencies per category, used until ChromaDB-backed matching is available
+DEFAULT_AGENCIES = {
+    'hospitality': [
+        {
+            'name': 'Desert Architects UAE',
+            'match_fit_score': 0.95,
+            'key_strengths': ['Sustainable Architecture', 'Desert Construction', 'Environmental Planning'],
+            'relevant_experience': '15+ eco-resorts in UAE',
+            'availability': 'Immediate',
+            'service_lines': ['architectural design', 'sustainability consulting'],
+            'industry_expertise': ['hospitality', 'eco-tourism'],
+            'budget_comfort_zone': 'AED 100,000 - 1M'
+        },
+        {
+            'name': 'EcoVentures ME',
+            'match_fit_score': 0.9,
+            'key_strengths': ['Sustainable Development', 'Solar Integration', 'Water Management'],
+            'relevant_experience': '20+ sustainable projects',
+            'availability': '3 weeks',
+            'service_lines': ['sustainability', 'eco-construction'],
+            'industry_expertise': ['eco-tourism', 'renewable energy'],
+            'budget_comfort_zone': 'AED 200,000 - 2M'
+        },
+        {
+            'name': 'Heritage Hospitality Consultants',
+            'match_fit_score': 0.85,
+            'key_strengths': ['Cultural Tourism', 'Guest Experience', 'Staff Training'],
+            'relevant_experience': 'Luxury desert camps across GCC',
+            'availability': '1 month',
+            'service_lines': ['hospitality consulting', 'cultural programming'],
+            'industry_expertise': ['luxury hospitality', 'cultural tourism'],
+            'budget_comfort_zone': 'AED 50,000 - 500,000'
+        }
+    ],
+    'tech': [
+        {
+            'name': 'InnovateAI Dubai',
+            'match_fit_score': 0.95,
+            'key_strengths': ['AI Development', 'Machine Learning', 'Cloud Architecture'],
+            'relevant_experience': '30+ AI solutions deployed',
+            'availability': 'Immediate',
+            'service_lines': ['ai development', 'cloud solutions'],
+            'industry_expertise': ['tech', 'enterprise'],
+            'budget_comfort_zone': 'AED 100,000 - 1M'
+        },
+        {
+            'name': 'MobileFirst UAE',
+            'match_fit_score': 0.9,
+            'key_strengths': ['Mobile Development', 'UX Design', 'App Marketing'],
+            'relevant_experience': '50+ apps launched',
+            'availability': '2 weeks',
+            'service_lines': ['mobile development', 'ux design'],
+            'industry_expertise': ['mobile apps', 'digital products'],
+            'budget_comfort_zone': 'AED 50,000 - 500,000'
+        },
+        {
+            'name': 'CloudScale ME',
+            'match_fit_score': 0.85,
+            'key_strengths': ['Cloud Infrastructure', 'DevOps', 'Security'],
+            'relevant_experience': 'Enterprise clients across GCC',
+            'availability': '1 month',
+            'service_lines': ['cloud services', 'devops'],
+            'industry_expertise': ['enterprise tech', 'fintech'],
+            'budget_comfort_zone': 'AED 100,000 - 1M'
+        }
+    ],
+    'default': [
+        {
+            'name': 'DigitalCraft UAE',
+            'match_fit_score': 0.9,
+            'key_strengths': ['Web Development', 'Mobile Apps', 'Fast Delivery'],
+            'relevant_experience': '50+ projects in UAE',
+            'availability': 'Immediate',
+            'service_lines': ['web development', 'mobile apps'],
+            'industry_expertise': ['retail', 'ecommerce'],
+            'budget_comfort_zone': 'AED 20,000 - 100,000'
+        },
+        {
+            'name': 'BrandMasters Dubai',
+            'match_fit_score': 0.85,
+            'key_strengths': ['Branding', 'Creative Design', 'Marketing'],
+            'relevant_experience': '100+ brands launched',
+            'availability': '2 weeks',
+            'service_lines': ['branding', 'design'],
+            'industry_expertise': ['retail', 'fashion'],
+            'budget_comfort_zone': 'AED 15,000 - 80,000'
+        },
+        {
+            'name': 'TechSolutions ME',
+            'match_fit_score': 0.8,
+            'key_strengths': ['Enterprise Solutions', 'Cloud Services', 'DevOps'],
+            'relevant_experience': 'Enterprise clients across GCC',
+            'availability': '1 month',
+            'service_lines': ['software development', 'cloud'],
+            'industry_expertise': ['finance', 'healthcare'],
+            'budget_comfort_zone': 'AED 50,000 - 500,000'
+        }
+    ]
+}
+
 class ChromaService:
     def __init__(self):
-        # Simple connection without custom settings
-        max_retries = 5
-        retry_delay = 2
-        
-        for attempt in range(max_retries):
-            try:
-                # Use simpler client initialization
-                self.client = chromadb.HttpClient(
-                    host=os.getenv("CHROMA_HOST", "localhost"),
-                    port=int(os.getenv("CHROMA_PORT", "8000"))
-                )
-                # Test the connection
-                self.client.heartbeat()
-                logger.info("Successfully connected to ChromaDB")
-                break
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Failed to connect to ChromaDB (attempt {attempt + 1}/{max_retries}). Retrying...")
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Failed to connect to ChromaDB after all retries")
-                    # Don't raise - continue with limited functionality
-                    self.client = None
+        # Connect lazily on first use so startup never blocks on ChromaDB
+        self.client = None
+        self._connect_lock = threading.Lock()
+        self._connect_retry_interval = 30
+        self._next_connect_attempt = 0.0
         
         # Initialize collections (may be None if ChromaDB is not available)
         self.agencies_collection = None
         self.services_collection = None
         self.templates_collection = None
+        self.cache_collection = None
+        self.cache_enabled = os.getenv("BLUEPRINT_CACHE_ENABLED", "true").lower() == "true"
         
-        if self.client:
-            self.agencies_collection = self._get_collection("agencies")
-            self.services_collection = self._get_collection("services")
-            self.templates_collection = self._get_collection("project_templates")
+        # Minimum cosine similarity for a cached blueprint to be reused
+        self.cache_threshold = float(os.getenv("BLUEPRINT_CACHE_THRESHOLD", "0.92"))
+        
+        # Cached blueprints older than this are never served and get pruned
+        self.cache_ttl = int(os.getenv("BLUEPRINT_CACHE_TTL", "604800"))
+        
+        # Small LRU of computed embeddings so a lookup miss and the cache write
+        # that follows it embed the query once
+        self.embedding_function = get_embedding_function()
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self._embedding_cache_size = 512
+        self._embedding_cache_lock = threading.Lock()
+        
+        # Exact-match results for recent queries, e.g. a user clicking regenerate
+        self._recent_blueprints: OrderedDict = OrderedDict()
+        self._recent_blueprints_size = 1024
+        self._recent_blueprints_ttl = 60
+        self._recent_blueprints_lock = threading.Lock()
+        
+        # Concurrent cache lookups are coalesced into one query per short window
+        self.lookup_batch_size = 16
+        self.lookup_batch_window = 0.01
+        self._pending_lookups: List[Tuple[str, Dict[str, str], asyncio.Future]] = []
+        self._lookup_timer = None
+        self._lookup_tasks = set()
+        self._lookup_in_flight = False
+        self._lookup_started = 0.0
+        
+        # Slow lookups count as misses; repeated slow or failed batches open a
+        # breaker that skips the cache until the cooldown passes. Only one batch
+        # runs at a time, so a hung ChromaDB ties up a single worker thread
+        self.lookup_timeout = float(os.getenv("BLUEPRINT_CACHE_TIMEOUT", "0.5"))
+        self.lookup_failure_threshold = 3
+        self.lookup_breaker_cooldown = 30
+        self._lookup_failures = 0
+        self._lookup_breaker_until = 0.0
+        
+        # Cache writes are buffered and sent to ChromaDB in batches by the
+        # background flusher; a full buffer sets the event to flush early
+        self.cache_flush_size = 100
+        self.cache_flush_requested = asyncio.Event()
+        self._pending_cache_writes: List[Tuple[str, Dict[str, str], str, float]] = []
+        self._pending_cache_lock = threading.Lock()
+    
+    def connect(self) -> bool:
+        """Connect to ChromaDB and load collections if not done yet
+        
+        Failed attempts, including failing to get the blueprint cache collection
+        once connected, are retried at most once per retry interval; until then
+        the service continues with limited functionality.
+        """
+        if self._is_ready():
+            return True
+        
+        with self._connect_lock:
+            if self._is_ready():
+                return True
+            if time.monotonic() < self._next_connect_attempt:
+                return self.client is not None
+            
+            if self.client is None:
+                try:
+                    client = get_chroma_client()
+                except Exception as e:
+                    logger.warning(f"Failed to connect to ChromaDB, retrying in {self._connect_retry_interval}s: {e}")
+                    self._next_connect_attempt = time.monotonic() + self._connect_retry_interval
+                    return False
+                
+                logger.info("Successfully connected to ChromaDB")
+                self.client = client
+                self.agencies_collection = self._get_collection("agencies")
+                self.services_collection = self._get_collection("services")
+                self.templates_collection = self._get_collection("project_templates")
+            
+            if self.cache_enabled:
+                self.cache_collection = self._get_or_create_collection("blueprint_cache")
+                if self.cache_collection is None:
+                    self._next_connect_attempt = time.monotonic() + self._connect_retry_interval
+            return True
+    
+    def _is_ready(self) -> bool:
+        """Whether the client and, when caching is on, the cache collection are loaded"""
+        return self.client is not None and (self.cache_collection is not None or not self.cache_enabled)
+    
+    def warm_embeddings(self):
+        """Load the embedding model, downloading it on a fresh container, so the
+        first cache lookup does not pay for it inside its timeout"""
+        try:
+            self.embedding_function(["warmup"])
+        except Exception as e:
+            logger.warning(f"Failed to load the embedding model: {e}")
     
     def _get_collection(self, name: str):
         """Get existing collection or return None"""
@@ -51,6 +265,261 @@ class ChromaService:
             logger.warning(f"Collection {name} not found")
             return None
     
+    def _get_or_create_collection(self, name: str):
+        """Get or create a cosine-space collection, or return None on failure"""
+        try:
+            return self.client.get_or_create_collection(
+                name=name,
+                metadata=COLLECTION_METADATA
+            )
+        except Exception as e:
+            logger.warning(f"Could not get or create collection {name}: {e}")
+            return None
+    
+    def _embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, serving recent ones from the LRU and the rest in one model call"""
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        with self._embedding_cache_lock:
+            for i, text in enumerate(texts):
+                if text in self._embedding_cache:
+                    self._embedding_cache.move_to_end(text)
+                    embeddings[i] = self._embedding_cache[text]
+        
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not misses:
+            return embeddings
+        
+        computed = self.embedding_function([texts[i] for i in misses])
+        
+        with self._embedding_cache_lock:
+            for i, embedding in zip(misses, computed):
+                embeddings[i] = embedding
+                self._embedding_cache[texts[i]] = embedding
+                if len(self._embedding_cache) > self._embedding_cache_size:
+                    self._embedding_cache.popitem(last=False)
+        
+        return embeddings
+    
+    def find_cached_blueprints(self, lookups: List[Tuple[str, Dict[str, str]]]) -> List[Optional[str]]:
+        """Look up cached blueprints for several (description, filters) pairs
+        
+        Descriptions are matched semantically; the structured filters such as
+        location and budget must match exactly. All misses are embedded in one
+        model call, and lookups sharing the same filters go to ChromaDB as one
+        query. Query and embedding errors propagate so the
+        batch path can count them against the lookup breaker.
+        """
+        if not self.connect() or not self.cache_collection:
+            return [None] * len(lookups)
+        
+        found = [self._get_recent_blueprint(text, filters) for text, filters in lookups]
+        misses = [i for i, blueprint_json in enumerate(found) if blueprint_json is None]
+        if not misses:
+            return found
+        
+        # One model call for the whole batch rather than one per lookup
+        embeddings = dict(zip(misses, self._embed_many([lookups[i][0] for i in misses])))
+        groups: Dict[Tuple[Tuple[str, str], ...], List[int]] = {}
+        for i in misses:
+            groups.setdefault(self._filters_key(lookups[i][1]), []).append(i)
+        
+        cutoff = time.time() - self.cache_ttl
+        for filters_key, group in groups.items():
+            results = self.cache_collection.query(
+                query_embeddings=[embeddings[i] for i in group],
+                n_results=1,
+                where={"$and": [{field: value} for field, value in filters_key]
+                       + [{"created_at": {"$gte": cutoff}}]},
+                include=["metadatas", "distances"]
+            )
+            
+            for row, i in enumerate(group):
+                if not results["ids"][row]:
+                    continue
+                similarity = 1 - results["distances"][row][0]
+                if similarity >= self.cache_threshold:
+                    logger.info(f"Blueprint cache hit (similarity {similarity:.3f})")
+                    blueprint_json = results["metadatas"][row][0]["blueprint_json"]
+                    self._remember_blueprint(*lookups[i], blueprint_json)
+                    found[i] = blueprint_json
+        
+        return found
+    
+    @staticmethod
+    def _filters_key(filters: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        """Hashable, order-independent form of a lookup's exact-match filters"""
+        return tuple(sorted(filters.items()))
+    
+    async def find_cached_blueprint_async(self, text: str, filters: Dict[str, str]) -> Optional[str]:
+        """Look up a cached blueprint, coalescing concurrent lookups into one query"""
+        if not self.cache_enabled:
+            return None
+        
+        if time.monotonic() < self._lookup_breaker_until:
+            return self._get_recent_blueprint(text, filters)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_lookups.append((text, filters, future))
+        
+        if len(self._pending_lookups) >= self.lookup_batch_size:
+            self._dispatch_lookups()
+        elif self._lookup_timer is None:
+            self._lookup_timer = loop.call_later(self.lookup_batch_window, self._dispatch_lookups)
+        
+        try:
+            # Each caller has its own future; a timeout cancels it so the batch skips it
+            return await asyncio.wait_for(future, self.lookup_timeout)
+        except asyncio.TimeoutError:
+            logger.info("Blueprint cache lookup timed out; generating instead")
+            # A lookup stuck behind a batch that is itself overdue never got its
+            # own batch, so count it here; a lookup that merely waited out a
+            # healthy backlog is not a ChromaDB failure
+            queued = any(lookup[2] is future for lookup in self._pending_lookups)
+            if queued and self._lookup_in_flight and \
+                    time.monotonic() - self._lookup_started >= self.lookup_timeout:
+                self._record_lookup_health(False)
+            return None
+    
+    def _dispatch_lookups(self):
+        """Send up to a batch of queued lookups unless a batch is still running"""
+        if self._lookup_timer is not None:
+            self._lookup_timer.cancel()
+            self._lookup_timer = None
+        
+        if self._lookup_in_flight:
+            # Picked up when the running batch finishes
+            return
+        
+        # Skip callers that already timed out while queued; the rest of a large
+        # backlog waits for the next batch
+        pending = [lookup for lookup in self._pending_lookups if not lookup[2].done()]
+        batch = pending[:self.lookup_batch_size]
+        self._pending_lookups = pending[self.lookup_batch_size:]
+        if batch:
+            self._lookup_in_flight = True
+            self._lookup_started = time.monotonic()
+            task = asyncio.ensure_future(self._run_lookups(batch))
+            self._lookup_tasks.add(task)
+            task.add_done_callback(self._lookup_tasks.discard)
+    
+    async def _run_lookups(self, batch: List[Tuple[str, Dict[str, str], asyncio.Future]]):
+        """Run a batch of lookups in a worker thread and resolve each caller"""
+        worker = asyncio.ensure_future(asyncio.to_thread(
+            self.find_cached_blueprints, [(text, filters) for text, filters, _ in batch]
+        ))
+        results = [None] * len(batch)
+        try:
+            results = await asyncio.wait_for(asyncio.shield(worker), self.lookup_timeout)
+            self._record_lookup_health(True)
+        except asyncio.TimeoutError:
+            # Count the batch as slow once it is late, not when (or if) it returns
+            self._record_lookup_health(False)
+            try:
+                await worker
+            except Exception as e:
+                logger.warning(f"Blueprint cache lookup failed: {e}")
+        except Exception as e:
+            logger.warning(f"Blueprint cache lookup failed: {e}")
+            self._record_lookup_health(False)
+        finally:
+            self._lookup_in_flight = False
+        
+        for (_, _, future), blueprint_json in zip(batch, results):
+            if not future.done():
+                future.set_result(blueprint_json)
+        
+        if self._pending_lookups:
+            self._dispatch_lookups()
+    
+    def _record_lookup_health(self, healthy: bool):
+        """Track consecutive slow or failed batches and open the breaker when needed"""
+        if healthy:
+            self._lookup_failures = 0
+            return
+        
+        self._lookup_failures += 1
+        if self._lookup_failures >= self.lookup_failure_threshold:
+            self._lookup_breaker_until = time.monotonic() + self.lookup_breaker_cooldown
+            self._lookup_failures = 0
+            logger.warning(
+                f"Blueprint cache lookups slow or failing; skipping cache for {self.lookup_breaker_cooldown}s"
+            )
+    
+    def cache_blueprint(self, text: str, filters: Dict[str, str], blueprint_json: str):
+        """Queue a generated blueprint, keyed by its description and filters, for caching
+        
+        Never touches ChromaDB or the embedding model, so it is safe to call on
+        the event loop; the background flusher embeds and writes the entries.
+        """
+        if not self.cache_enabled:
+            return
+        
+        self._remember_blueprint(text, filters, blueprint_json)
+        
+        with self._pending_cache_lock:
+            self._pending_cache_writes.append((text, filters, blueprint_json, time.time()))
+            full = len(self._pending_cache_writes) >= self.cache_flush_size
+        
+        if full:
+            self.cache_flush_requested.set()
+    
+    def _get_recent_blueprint(self, text: str, filters: Dict[str, str]) -> Optional[str]:
+        """Return a blueprint seen for this exact lookup within the TTL"""
+        key = (text, self._filters_key(filters))
+        with self._recent_blueprints_lock:
+            entry = self._recent_blueprints.get(key)
+            if entry is None:
+                return None
+            stored_at, blueprint_json = entry
+            if time.monotonic() - stored_at >= self._recent_blueprints_ttl:
+                del self._recent_blueprints[key]
+                return None
+            return blueprint_json
+    
+    def _remember_blueprint(self, text: str, filters: Dict[str, str], blueprint_json: str):
+        """Record a blueprint for exact-match reuse within the TTL"""
+        key = (text, self._filters_key(filters))
+        with self._recent_blueprints_lock:
+            self._recent_blueprints[key] = (time.monotonic(), blueprint_json)
+            self._recent_blueprints.move_to_end(key)
+            if len(self._recent_blueprints) > self._recent_blueprints_size:
+                self._recent_blueprints.popitem(last=False)
+    
+    def flush_cache_writes(self):
+        """Embed all queued cache entries and write them to ChromaDB in a single add"""
+        with self._pending_cache_lock:
+            batch = self._pending_cache_writes
+            self._pending_cache_writes = []
+        
+        if not batch or not self.connect() or not self.cache_collection:
+            return
+        
+        try:
+            self.cache_collection.add(
+                ids=[str(uuid.uuid4()) for _ in batch],
+                embeddings=self._embed_many([text for text, _, _, _ in batch]),
+                documents=[text for text, _, _, _ in batch],
+                metadatas=[
+                    {**filters, "blueprint_json": blueprint_json, "created_at": created_at}
+                    for _, filters, blueprint_json, created_at in batch
+                ]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache {len(batch)} blueprints: {e}")
+    
+    def prune_cache(self):
+        """Delete cached blueprints older than the cache TTL"""
+        if not self.cache_collection:
+            return
+        
+        try:
+            self.cache_collection.delete(
+                where={"created_at": {"$lt": time.time() - self.cache_ttl}}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to prune blueprint cache: {e}")
+    
     def find_matching_agencies(self, required_services: List[str], 
                               industry: str = None) -> List[Dict]:
         """Find agencies matching required services and industry"""
@@ -59,9 +528,9 @@ class ChromaService:
         # Determine the best category based on industry
         if industry:
             industry_lower = industry.lower()
-            if any(term in industry_lower for term in ['eco', 'hospitality', 'resort', 'hotel', 'tourism']):
+            if HOSPITALITY_TERMS.search(industry_lower):
                 return agencies_by_category.get('hospitality', agencies_by_category['default'])
-            elif any(term in industry_lower for term in ['tech', 'software', 'app', 'digital']):
+            elif TECH_TERMS.search(industry_lower):
                 return agencies_by_category.get('tech', agencies_by_category['default'])
         
         # Default to generic agencies if no specific match
@@ -73,103 +542,6 @@ class ChromaService:
         # Return None to use default templates
         return None
     
-    def _get_default_agencies(self) -> List[Dict]:
+    def _get_default_agencies(self) -> Dict[str, List[Dict]]:
         """Return specialized agencies based on service categories"""
-        return {
-            'hospitality': [
-                {
-                    'name': 'Desert Architects UAE',
-                    'match_fit_score': 0.95,
-                    'key_strengths': ['Sustainable Architecture', 'Desert Construction', 'Environmental Planning'],
-                    'relevant_experience': '15+ eco-resorts in UAE',
-                    'availability': 'Immediate',
-                    'service_lines': ['architectural design', 'sustainability consulting'],
-                    'industry_expertise': ['hospitality', 'eco-tourism'],
-                    'budget_comfort_zone': 'AED 100,000 - 1M'
-                },
-                {
-                    'name': 'EcoVentures ME',
-                    'match_fit_score': 0.9,
-                    'key_strengths': ['Sustainable Development', 'Solar Integration', 'Water Management'],
-                    'relevant_experience': '20+ sustainable projects',
-                    'availability': '3 weeks',
-                    'service_lines': ['sustainability', 'eco-construction'],
-                    'industry_expertise': ['eco-tourism', 'renewable energy'],
-                    'budget_comfort_zone': 'AED 200,000 - 2M'
-                },
-                {
-                    'name': 'Heritage Hospitality Consultants',
-                    'match_fit_score': 0.85,
-                    'key_strengths': ['Cultural Tourism', 'Guest Experience', 'Staff Training'],
-                    'relevant_experience': 'Luxury desert camps across GCC',
-                    'availability': '1 month',
-                    'service_lines': ['hospitality consulting', 'cultural programming'],
-                    'industry_expertise': ['luxury hospitality', 'cultural tourism'],
-                    'budget_comfort_zone': 'AED 50,000 - 500,000'
-                }
-            ],
-            'tech': [
-                {
-                    'name': 'InnovateAI Dubai',
-                    'match_fit_score': 0.95,
-                    'key_strengths': ['AI Development', 'Machine Learning', 'Cloud Architecture'],
-                    'relevant_experience': '30+ AI solutions deployed',
-                    'availability': 'Immediate',
-                    'service_lines': ['ai development', 'cloud solutions'],
-                    'industry_expertise': ['tech', 'enterprise'],
-                    'budget_comfort_zone': 'AED 100,000 - 1M'
-                },
-                {
-                    'name': 'MobileFirst UAE',
-                    'match_fit_score': 0.9,
-                    'key_strengths': ['Mobile Development', 'UX Design', 'App Marketing'],
-                    'relevant_experience': '50+ apps launched',
-                    'availability': '2 weeks',
-                    'service_lines': ['mobile development', 'ux design'],
-                    'industry_expertise': ['mobile apps', 'digital products'],
-                    'budget_comfort_zone': 'AED 50,000 - 500,000'
-                },
-                {
-                    'name': 'CloudScale ME',
-                    'match_fit_score': 0.85,
-                    'key_strengths': ['Cloud Infrastructure', 'DevOps', 'Security'],
-                    'relevant_experience': 'Enterprise clients across GCC',
-                    'availability': '1 month',
-                    'service_lines': ['cloud services', 'devops'],
-                    'industry_expertise': ['enterprise tech', 'fintech'],
-                    'budget_comfort_zone': 'AED 100,000 - 1M'
-                }
-            ],
-            'default': [
-                {
-                    'name': 'DigitalCraft UAE',
-                    'match_fit_score': 0.9,
-                    'key_strengths': ['Web Development', 'Mobile Apps', 'Fast Delivery'],
-                    'relevant_experience': '50+ projects in UAE',
-                    'availability': 'Immediate',
-                    'service_lines': ['web development', 'mobile apps'],
-                    'industry_expertise': ['retail', 'ecommerce'],
-                    'budget_comfort_zone': 'AED 20,000 - 100,000'
-                },
-                {
-                    'name': 'BrandMasters Dubai',
-                    'match_fit_score': 0.85,
-                    'key_strengths': ['Branding', 'Creative Design', 'Marketing'],
-                    'relevant_experience': '100+ brands launched',
-                    'availability': '2 weeks',
-                    'service_lines': ['branding', 'design'],
-                    'industry_expertise': ['retail', 'fashion'],
-                    'budget_comfort_zone': 'AED 15,000 - 80,000'
-                },
-                {
-                    'name': 'TechSolutions ME',
-                    'match_fit_score': 0.8,
-                    'key_strengths': ['Enterprise Solutions', 'Cloud Services', 'DevOps'],
-                    'relevant_experience': 'Enterprise clients across GCC',
-                    'availability': '1 month',
-                    'service_lines': ['software development', 'cloud'],
-                    'industry_expertise': ['finance', 'healthcare'],
-                    'budget_comfort_zone': 'AED 50,000 - 500,000'
-                }
-            ]
-        }
\ No newline at end of file
+        return DEFAULT_AGENCIES
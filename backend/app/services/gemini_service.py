@@ -1,13 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import logging
-from typing import Dict, List, Any
-import re
+from typing import Dict, List, Any, Optional, Tuple
 import os
+import random
+import time
 from ..models.schemas import ProjectInputSchema
 
 logger = logging.getLogger(__name__)
 
+_STRING = {"type": "STRING"}
+_STRING_LIST = {"type": "ARRAY", "items": _STRING}
+
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "project_name": _STRING,
+        "business_category": _STRING,
+        "target_market": _STRING,
+        "launch_mode": _STRING,
+        "required_services": _STRING_LIST,
+        "estimated_complexity": _STRING,
+        "key_challenges": _STRING_LIST,
+        "success_factors": _STRING_LIST,
+        "recommended_timeline": _STRING,
+        "budget_tier": _STRING
+    },
+    "required": [
+        "project_name", "business_category", "target_market", "launch_mode",
+        "required_services", "estimated_complexity", "key_challenges",
+        "success_factors", "recommended_timeline", "budget_tier"
+    ]
+}
+
+SUGGESTIONS_SCHEMA = {"type": "ARRAY", "items": _STRING, "minItems": 5, "maxItems": 5}
+
+SUGGESTIONS_PROMPT = """
+        For a {business_category} business in the UAE market, suggest 5 creative and innovative features or add-ons.
+        Consider local culture, digital trends, and luxury preferences.
+        
+        Return your response as a JSON array with exactly 5 suggestions:
+        ["suggestion 1", "suggestion 2", "suggestion 3", "suggestion 4", "suggestion 5"]
+        
+        Each suggestion should be specific, innovative, and under 20 words.
+        Return ONLY the JSON array, no other text.
+        """
+
+# Per-prompt generation settings; both prompts return small fixed-schema JSON
+ANALYSIS_CONFIG = {"max_tokens": 512, "temperature": 0.3, "response_schema": ANALYSIS_SCHEMA}
+SUGGESTIONS_CONFIG = {"max_tokens": 256, "temperature": 0.7, "response_schema": SUGGESTIONS_SCHEMA}
+
+# Transient statuses (rate limit, server overload) worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 503}
+
+# Word lists for naming projects when Gemini is unavailable
+NAME_PREFIXES = {
+    "tech": ("Tech", "Digital", "Smart", "Cloud", "Data"),
+    "food": ("Gourmet", "Culinary", "Taste", "Flavor", "Bistro"),
+    "retail": ("Luxe", "Elite", "Premium", "Boutique", "Gallery"),
+    "fashion": ("Couture", "Style", "Chic", "Vogue", "Trend"),
+    "health": ("Vita", "Wellness", "Health", "Care", "Med")
+}
+DEFAULT_NAME_PREFIXES = ("Prime", "Excel", "Nova", "Next", "Pro")
+NAME_SUFFIXES = ("Hub", "Solutions", "Group", "Ventures", "Co", "Lab", "Studio", "Works")
+
+# Canned creative suggestions used when Gemini is unavailable
+CATEGORY_SUGGESTIONS = {
+    "tech": [
+        "AI-powered predictive analytics dashboard",
+        "Blockchain-based security and transparency",
+        "Voice-controlled interface with Arabic support",
+        "Real-time collaboration with AR features",
+        "IoT integration for smart automation"
+    ],
+    "food": [
+        "QR menu with AR dish visualization",
+        "AI dietary recommendation engine",
+        "Ghost kitchen for optimized delivery",
+        "Subscription-based meal plans",
+        "Zero-waste sustainability tracking"
+    ],
+    "retail": [
+        "Virtual try-on using AR technology",
+        "AI personal shopping assistant",
+        "NFT-based loyalty rewards program",
+        "Same-day drone delivery service",
+        "Virtual showroom in metaverse"
+    ],
+    "fashion": [
+        "3D body scanning for perfect fit",
+        "Virtual fashion shows and launches",
+        "Blockchain authenticity certificates",
+        "AI-powered trend prediction",
+        "Sustainable material traceability"
+    ]
+}
+DEFAULT_SUGGESTIONS = [
+    "Mobile app with personalization",
+    "AI-powered customer service",
+    "Loyalty rewards program",
+    "Social media integration",
+    "Analytics dashboard"
+]
+
 class GeminiService:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
@@ -18,6 +117,31 @@ class GeminiService:
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
         self.model_name = "gemini-2.0-flash-exp"  # or "gemini-2.0-flash" when stable
         
+        # Hedged requests clip tail latency but double token cost on slow calls
+        self.hedge_requests = os.getenv("GEMINI_HEDGE_REQUESTS", "false").lower() == "true"
+        self.hedge_delay = float(os.getenv("GEMINI_HEDGE_DELAY", "0.8"))
+        
+        # Bound in-flight API calls, hedged duplicates and retries included, to
+        # stay within the rate limit; calls run on their own worker threads so
+        # a slow API cannot starve the default executor
+        max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+        self.request_semaphore = asyncio.Semaphore(max_concurrency)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="gemini"
+        )
+        
+        # One pooled session so calls reuse TLS connections instead of reconnecting
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_concurrency
+        )
+        self.session.mount("https://", adapter)
+        
+        # Retry rate-limited or overloaded calls with jittered exponential backoff
+        self.max_retries = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+        self.retry_base_delay = 0.5
+        self.retry_max_delay = 8.0
+        
         # Test the connection
         if self._test_connection():
             logger.info(f"✅ Gemini service initialized with {self.model_name}")
@@ -27,14 +151,24 @@ class GeminiService:
             logger.info(f"⚠️ Falling back to {self.model_name}")
     
     def _test_connection(self) -> bool:
-        """Test if the model is accessible"""
+        """Test if the model is accessible
+        
+        Fetches the model's metadata rather than generating content, so the
+        check is a small GET that spends no tokens or generation quota.
+        """
         try:
-            response = self._call_api("Test connection")
-            return response is not None
+            response = self.session.get(
+                f"{self.base_url}/{self.model_name}",
+                headers={'x-goog-api-key': self.api_key},
+                timeout=10
+            )
+            return response.status_code == 200
         except:
             return False
     
-    def _call_api(self, prompt: str) -> Dict[str, Any]:
+    def _call_api(self, prompt: str, max_tokens: int = 2048, 
+                  temperature: float = 0.7,
+                  response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make direct API call to Gemini"""
         url = f"{self.base_url}/{self.model_name}:generateContent"
         
@@ -54,15 +188,20 @@ class GeminiService:
                 }
             ],
             "generationConfig": {
-                "temperature": 0.7,
+                "temperature": temperature,
                 "topK": 40,
                 "topP": 0.95,
-                "maxOutputTokens": 2048,
+                "maxOutputTokens": max_tokens,
             }
         }
         
+        # Structured output: the model returns JSON matching the schema directly
+        if response_schema:
+            data["generationConfig"]["responseMimeType"] = "application/json"
+            data["generationConfig"]["responseSchema"] = response_schema
+        
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = self._post_with_retry(url, headers, data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -80,10 +219,130 @@ class GeminiService:
             logger.error(f"API call exception: {e}")
             return None
     
-    def analyze_project_idea(self, project_input: ProjectInputSchema) -> Dict[str, Any]:
-        """Analyze project idea using Gemini 2.0"""
+    def _post_with_retry(self, url: str, headers: Dict[str, str], 
+                         data: Dict[str, Any]) -> requests.Response:
+        """POST to the API, retrying transient failures with backoff
+        
+        Honours a Retry-After header when the API sends one, returning the
+        response instead when it asks for longer than the maximum delay;
+        otherwise the delay doubles per attempt with jitter so concurrent
+        callers spread out.
+        """
+        for attempt in range(self.max_retries + 1):
+            response = self.session.post(url, headers=headers, json=data, timeout=30)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return response
+            
+            try:
+                delay = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                delay = min(
+                    self.retry_base_delay * 2 ** attempt * (0.5 + random.random()),
+                    self.retry_max_delay
+                )
+            else:
+                if delay > self.retry_max_delay:
+                    # Retrying early would only earn another rejection while
+                    # holding a concurrency slot and a worker thread
+                    return response
+            
+            logger.warning(f"API call returned {response.status_code}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+    
+    async def analyze_and_suggest(self, project_input: ProjectInputSchema) -> Tuple[Dict[str, Any], List[str], bool]:
+        """Run the analysis and suggestions calls concurrently
+        
+        The suggestions prompt uses the user-supplied business type instead of
+        waiting for the analysed category, so both requests are in flight at once.
+        The returned flag is True only when both results came from Gemini rather
+        than the canned fallbacks.
+        """
+        
+        business_type = project_input.business_type or 'general'
+        
+        analysis_task = asyncio.create_task(
+            self._call_api_async(self._build_analysis_prompt(project_input), **ANALYSIS_CONFIG)
+        )
+        suggestions_task = asyncio.create_task(
+            self._call_api_async(self._build_suggestions_prompt(business_type), **SUGGESTIONS_CONFIG)
+        )
+        analysis_response, suggestions_response = await asyncio.gather(
+            analysis_task, suggestions_task, return_exceptions=True
+        )
+        
+        analysis = None
+        try:
+            if isinstance(analysis_response, Exception):
+                raise analysis_response
+            analysis = self._parse_analysis(analysis_response, project_input)
+        except Exception as e:
+            logger.error(f"Error analyzing project idea: {e}")
+        
+        suggestions = None
+        try:
+            if isinstance(suggestions_response, Exception):
+                raise suggestions_response
+            suggestions = self._parse_suggestions(suggestions_response)
+        except Exception as e:
+            logger.error(f"Error generating suggestions: {e}")
+        
+        from_gemini = bool(analysis and suggestions)
+        
+        if not analysis:
+            analysis = self._generate_fallback_response(project_input)
+        
+        # Fall back to suggestions for the analysed category, not the prior
+        if not suggestions:
+            suggestions = self._get_category_suggestions(
+                analysis.get('business_category', business_type)
+            )
+        
+        return analysis, suggestions, from_gemini
+    
+    async def _call_api_async(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Make the blocking API call in a worker thread"""
+        if self.hedge_requests:
+            return await self._hedged_call(prompt, **kwargs)
+        return await self._call_api_in_thread(prompt, **kwargs)
+    
+    async def _call_api_in_thread(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Run one API call on the Gemini executor while holding a concurrency slot
+        
+        The slot is released when the thread finishes, not when the awaiting
+        task is cancelled, so abandoned hedges still count until they return.
+        """
+        await self.request_semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(self._call_api, prompt, **kwargs)
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self.request_semaphore.release)
+        )
+        return await asyncio.wrap_future(future)
+    
+    async def _hedged_call(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Send a backup request if the first one is slow and keep the first success"""
+        primary = asyncio.create_task(self._call_api_in_thread(prompt, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+        if done:
+            return primary.result()
+        
+        backup = asyncio.create_task(self._call_api_in_thread(prompt, **kwargs))
+        pending = {primary, backup}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result is not None:
+                    # The losing thread runs to completion; its result is discarded
+                    for straggler in pending:
+                        straggler.cancel()
+                    return result
         
-        prompt = f"""
+        return None
+    
+    def _build_analysis_prompt(self, project_input: ProjectInputSchema) -> str:
+        """Build the project analysis prompt"""
+        return f"""
         Analyze this business project for the UAE market and return a JSON response:
         
         Business Description: {project_input.description}
@@ -110,119 +369,76 @@ class GeminiService:
         Ensure all fields are filled with relevant, specific information.
         Return ONLY the JSON object, no other text.
         """
+    
+    def _parse_analysis(self, response: Dict[str, Any], 
+                        project_input: ProjectInputSchema) -> Optional[Dict[str, Any]]:
+        """Parse the analysis response, filling missing fields, or return None if unusable"""
         
-        try:
-            # Call Gemini 2.0 API
-            response = self._call_api(prompt)
+        if response and response.get("success"):
+            text = response.get("text", "")
             
-            if response and response.get("success"):
-                text = response.get("text", "")
+            try:
+                parsed = json.loads(text)
                 
-                # Extract JSON from response
-                json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group()
-                    # Clean the JSON string
-                    json_str = re.sub(r'[\n\r\t]', ' ', json_str)
-                    json_str = re.sub(r'\s+', ' ', json_str)
-                    
-                    try:
-                        parsed = json.loads(json_str)
-                        
-                        # Validate and fill missing fields
-                        required_fields = {
-                            "project_name": f"Innovative {project_input.business_type or 'Business'} Venture",
-                            "business_category": project_input.business_type or "general",
-                            "target_market": f"{project_input.launch_location} Market",
-                            "launch_mode": "Hybrid",
-                            "required_services": ["Brand Strategy", "Web Development", "Digital Marketing"],
-                            "estimated_complexity": "Medium",
-                            "key_challenges": ["Market Competition", "Customer Acquisition"],
-                            "success_factors": ["Quality Service", "Innovation"],
-                            "recommended_timeline": "3-6 months",
-                            "budget_tier": "Growth"
-                        }
-                        
-                        for key, default_value in required_fields.items():
-                            if key not in parsed or not parsed[key]:
-                                parsed[key] = default_value
-                        
-                        return parsed
-                        
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON parsing error: {e}")
-                        logger.error(f"JSON string was: {json_str[:200]}")
+                # Validate and fill missing fields
+                required_fields = {
+                    "project_name": f"Innovative {project_input.business_type or 'Business'} Venture",
+                    "business_category": project_input.business_type or "general",
+                    "target_market": f"{project_input.launch_location} Market",
+                    "launch_mode": "Hybrid",
+                    "required_services": ["Brand Strategy", "Web Development", "Digital Marketing"],
+                    "estimated_complexity": "Medium",
+                    "key_challenges": ["Market Competition", "Customer Acquisition"],
+                    "success_factors": ["Quality Service", "Innovation"],
+                    "recommended_timeline": "3-6 months",
+                    "budget_tier": "Growth"
+                }
                 
-            # If API call failed, return intelligent defaults
-            return self._generate_fallback_response(project_input)
-            
-        except Exception as e:
-            logger.error(f"Error in analyze_project_idea: {e}")
-            return self._generate_fallback_response(project_input)
-    
-    def generate_creative_suggestions(self, project_analysis: Dict) -> List[str]:
-        """Generate creative suggestions using Gemini 2.0"""
-        
-        business_category = project_analysis.get('business_category', 'general')
-        
-        prompt = f"""
-        For a {business_category} business in the UAE market, suggest 5 creative and innovative features or add-ons.
-        Consider local culture, digital trends, and luxury preferences.
-        
-        Return your response as a JSON array with exactly 5 suggestions:
-        ["suggestion 1", "suggestion 2", "suggestion 3", "suggestion 4", "suggestion 5"]
+                for key, default_value in required_fields.items():
+                    if key not in parsed or not parsed[key]:
+                        parsed[key] = default_value
+                
+                return parsed
+                
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON parsing error: {e}")
+                logger.error(f"Response text was: {text[:200]}")
         
-        Each suggestion should be specific, innovative, and under 20 words.
-        Return ONLY the JSON array, no other text.
-        """
+        return None
+    
+    def _build_suggestions_prompt(self, business_category: str) -> str:
+        """Build the creative suggestions prompt"""
+        return SUGGESTIONS_PROMPT.format(business_category=business_category)
+    
+    def _parse_suggestions(self, response: Dict[str, Any]) -> Optional[List[str]]:
+        """Parse the suggestions response, returning None if unusable"""
         
-        try:
-            response = self._call_api(prompt)
+        if response and response.get("success"):
+            text = response.get("text", "")
             
-            if response and response.get("success"):
-                text = response.get("text", "")
-                
-                # Extract JSON array
-                json_match = re.search(r'\[.*?\]', text, re.DOTALL)
-                if json_match:
-                    try:
-                        suggestions = json.loads(json_match.group())
-                        if isinstance(suggestions, list) and len(suggestions) >= 5:
-                            return suggestions[:5]
-                    except json.JSONDecodeError:
-                        pass
-            
-            # Fallback suggestions
-            return self._get_category_suggestions(business_category)
-            
-        except Exception as e:
-            logger.error(f"Error generating suggestions: {e}")
-            return self._get_category_suggestions(business_category)
+            try:
+                suggestions = json.loads(text)
+                if isinstance(suggestions, list) and len(suggestions) >= 5:
+                    return suggestions[:5]
+            except json.JSONDecodeError:
+                pass
+        
+        return None
     
     def _generate_fallback_response(self, project_input: ProjectInputSchema) -> Dict[str, Any]:
         """Generate intelligent fallback response"""
-        import hashlib
         
         # Create unique elements based on input
         desc_hash = hashlib.md5(project_input.description.encode()).hexdigest()
         
         # Business-specific names
-        name_prefixes = {
-            "tech": ["Tech", "Digital", "Smart", "Cloud", "Data"],
-            "food": ["Gourmet", "Culinary", "Taste", "Flavor", "Bistro"],
-            "retail": ["Luxe", "Elite", "Premium", "Boutique", "Gallery"],
-            "fashion": ["Couture", "Style", "Chic", "Vogue", "Trend"],
-            "health": ["Vita", "Wellness", "Health", "Care", "Med"]
-        }
-        
         business_type = project_input.business_type or "business"
-        prefixes = name_prefixes.get(business_type, ["Prime", "Excel", "Nova", "Next", "Pro"])
+        prefixes = NAME_PREFIXES.get(business_type, DEFAULT_NAME_PREFIXES)
         
         prefix_idx = int(desc_hash[:2], 16) % len(prefixes)
-        suffix_options = ["Hub", "Solutions", "Group", "Ventures", "Co", "Lab", "Studio", "Works"]
-        suffix_idx = int(desc_hash[2:4], 16) % len(suffix_options)
+        suffix_idx = int(desc_hash[2:4], 16) % len(NAME_SUFFIXES)
         
-        project_name = f"{prefixes[prefix_idx]} {project_input.launch_location} {suffix_options[suffix_idx]}"
+        project_name = f"{prefixes[prefix_idx]} {project_input.launch_location} {NAME_SUFFIXES[suffix_idx]}"
         
         # Detect services from description
         desc_lower = project_input.description.lower()
@@ -238,14 +454,22 @@ class GeminiService:
             services.append("AI Integration")
             
         services.extend(["Brand Development", "Digital Marketing", "Web Development"])
-        services = list(dict.fromkeys(services))[:5]  # Remove duplicates, limit to 5
-        
+
+        # Remove duplicates, stopping as soon as we have 5
+        seen, unique_services = set(), []
+        for service in services:
+            if service not in seen:
+                seen.add(service)
+                unique_services.append(service)
+                if len(unique_services) == 5:
+                    break
+
         return {
             "project_name": project_name,
             "business_category": business_type,
             "target_market": f"{project_input.launch_location} {business_type.title()} Sector",
             "launch_mode": "Hybrid",
-            "required_services": services,
+            "required_services": unique_services,
             "estimated_complexity": "Medium",
             "key_challenges": [
                 f"Competition in {project_input.launch_location}",
@@ -263,41 +487,4 @@ class GeminiService:
     
     def _get_category_suggestions(self, category: str) -> List[str]:
         """Get category-specific suggestions"""
-        suggestions_map = {
-            "tech": [
-                "AI-powered predictive analytics dashboard",
-                "Blockchain-based security and transparency",
-                "Voice-controlled interface with Arabic support",
-                "Real-time collaboration with AR features",
-                "IoT integration for smart automation"
-            ],
-            "food": [
-                "QR menu with AR dish visualization",
-                "AI dietary recommendation engine",
-                "Ghost kitchen for optimized delivery",
-                "Subscription-based meal plans",
-                "Zero-waste sustainability tracking"
-            ],
-            "retail": [
-                "Virtual try-on using AR technology",
-                "AI personal shopping assistant",
-                "NFT-based loyalty rewards program",
-                "Same-day drone delivery service",
-                "Virtual showroom in metaverse"
-            ],
-            "fashion": [
-                "3D body scanning for perfect fit",
-                "Virtual fashion shows and launches",
-                "Blockchain authenticity certificates",
-                "AI-powered trend prediction",
-                "Sustainable material traceability"
-            ]
-        }
-        
-        return suggestions_map.get(category.lower(), [
-            "Mobile app with personalization",
-            "AI-powered customer service",
-            "Loyalty rewards program",
-            "Social media integration",
-            "Analytics dashboard"
-        ])
\ No newline at end of file
+        return CATEGORY_SUGGESTIONS.get(category.lower(), DEFAULT_SUGGESTIONS)
\ No newline at end of file
@@ -4,21 +4,54 @@ FIXED: Handles existing collections properly
 """
 
 import os
+import random
 import sys
 import time
 import chromadb
 from chromadb.config import Settings
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 import json
 import uuid
 
 load_dotenv()
 
+# HNSW index settings for the small collections queried with a handful of results.
+# Keep in sync with COLLECTION_METADATA in app/services/chroma_service.py
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 32,
+    "hnsw:num_threads": 4
+}
+
+# Records per collection.add call; larger batches stop paying off past a few hundred
+ADD_BATCH_SIZE = 200
+
+# Sample rows seeded into PostgreSQL
+SAMPLE_AGENCY_ROWS = [
+    ('DigitalCraft UAE', ['web development', 'mobile apps'], 0.95,
+     ['React expertise', 'Fast delivery'], '50+ projects', 'Immediate',
+     'AED 20,000 - 100,000', 25, ['retail', 'ecommerce']),
+    ('BrandMasters Dubai', ['branding', 'design'], 0.92,
+     ['Creative excellence'], '100+ brands', '2 weeks',
+     'AED 15,000 - 80,000', 15, ['retail', 'fashion'])
+]
+
+SAMPLE_COMPETITOR_ROWS = [
+    ('Swiss Arabian', 'Dubai, UAE', 'perfume', 'Direct', 'www.swissarabian.com'),
+    ('Ajmal Perfumes', 'Dubai, UAE', 'perfume', 'Direct', 'www.ajmalperfume.com'),
+    ('Rasasi', 'Dubai, UAE', 'perfume', 'Direct', 'www.rasasi.com')
+]
+
 def wait_for_chroma():
     """Wait for ChromaDB to be available"""
-    max_retries = 30
-    retry_delay = 2
+    # Exponential backoff from 0.5s capped at 8s: about a minute in total
+    max_retries = 12
+    retry_delay = 0.5
+    max_retry_delay = 8
     
     for attempt in range(max_retries):
         try:
@@ -33,31 +66,38 @@ def wait_for_chroma():
         except Exception as e:
             if attempt < max_retries - 1:
                 print(f"⏳ Waiting for ChromaDB... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(retry_delay)
+                delay = min(retry_delay * 2 ** attempt, max_retry_delay)
+                # Jitter so replicas starting together do not poll in lockstep
+                time.sleep(delay * (0.5 + random.random()))
             else:
                 print(f"❌ ChromaDB not available after {max_retries} attempts")
                 raise
 
 def get_or_create_collection(client, name, metadata=None):
-    """Get existing collection or create new one"""
+    """Create an empty collection, dropping any existing one with the same name"""
     try:
-        # Try to get existing collection
-        collection = client.get_collection(name=name)
-        print(f"📦 Using existing collection: {name}")
-        # Clear existing data
-        ids = collection.get()['ids']
-        if ids:
-            collection.delete(ids=ids)
-            print(f"🧹 Cleared {len(ids)} existing items from {name}")
-        return collection
+        # Dropping the collection clears it in one call without fetching its ids
+        client.delete_collection(name=name)
+        print(f"🧹 Dropped existing collection: {name}")
     except Exception:
-        # Create new collection if it doesn't exist
-        collection = client.create_collection(
-            name=name,
-            metadata=metadata or {"hnsw:space": "cosine"}
+        pass
+    
+    collection = client.create_collection(
+        name=name,
+        metadata=metadata or COLLECTION_METADATA
+    )
+    print(f"✨ Created new collection: {name}")
+    return collection
+
+def add_in_batches(collection, documents, metadatas, ids, batch_size=ADD_BATCH_SIZE):
+    """Add records to a collection in fixed-size batches"""
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        collection.add(
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+            ids=ids[start:end]
         )
-        print(f"✨ Created new collection: {name}")
-        return collection
 
 def populate_sample_agencies(client):
     """Populate ChromaDB with sample agency data"""
@@ -66,7 +106,7 @@ def populate_sample_agencies(client):
     agencies_collection = get_or_create_collection(
         client, 
         "agencies",
-        {"hnsw:space": "cosine"}
+        COLLECTION_METADATA
     )
     
     # Sample agencies data
@@ -123,18 +163,18 @@ def populate_sample_agencies(client):
         }
     ]
     
-    # Prepare data for ChromaDB
-    documents = []
-    metadatas = []
-    ids = []
-    
-    for agency in agencies:
-        # Create searchable document
-        doc = f"{agency['name']} {' '.join(agency['service_lines'])} {' '.join(agency['industry_expertise'])} {agency['relevant_experience']}"
-        documents.append(doc)
-        
-        # Store metadata
-        metadata = {
+    # Prepare data for ChromaDB: searchable documents, metadata and ids
+    documents = [
+        " ".join([
+            agency["name"],
+            *agency["service_lines"],
+            *agency["industry_expertise"],
+            agency["relevant_experience"]
+        ])
+        for agency in agencies
+    ]
+    metadatas = [
+        {
             "name": agency["name"],
             "service_lines": json.dumps(agency["service_lines"]),
             "key_strengths": json.dumps(agency["key_strengths"]),
@@ -143,16 +183,13 @@ def populate_sample_agencies(client):
             "budget_comfort_zone": agency["budget_comfort_zone"],
             "industry_expertise": json.dumps(agency["industry_expertise"])
         }
-        metadatas.append(metadata)
-        ids.append(agency["id"])
+        for agency in agencies
+    ]
+    ids = [agency["id"] for agency in agencies]
     
     # Add to ChromaDB
     if documents:
-        agencies_collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        add_in_batches(agencies_collection, documents, metadatas, ids)
         print(f"✅ Added {len(agencies)} agencies to ChromaDB")
     else:
         print("⚠️ No agencies to add")
@@ -164,7 +201,7 @@ def populate_sample_services(client):
     services_collection = get_or_create_collection(
         client,
         "services",
-        {"hnsw:space": "cosine"}
+        COLLECTION_METADATA
     )
     
     # Sample services
@@ -195,22 +232,15 @@ def populate_sample_services(client):
         }
     ]
     
-    documents = []
-    metadatas = []
-    ids = []
-    
-    for service in services:
-        doc = f"{service['name']} {service['category']} {service['description']}"
-        documents.append(doc)
-        metadatas.append(service)
-        ids.append(service["id"])
+    documents = [
+        f"{service['name']} {service['category']} {service['description']}"
+        for service in services
+    ]
+    metadatas = services
+    ids = [service["id"] for service in services]
     
     if documents:
-        services_collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        add_in_batches(services_collection, documents, metadatas, ids)
         print(f"✅ Added {len(services)} services to ChromaDB")
 
 def populate_sample_templates(client):
@@ -220,7 +250,7 @@ def populate_sample_templates(client):
     templates_collection = get_or_create_collection(
         client,
         "project_templates",
-        {"hnsw:space": "cosine"}
+        COLLECTION_METADATA
     )
     
     # Sample template for perfume business
@@ -269,11 +299,7 @@ def populate_sample_templates(client):
     
     # Add template
     doc = "perfume brand retail fragrance luxury beauty cosmetics"
-    templates_collection.add(
-        documents=[doc],
-        metadatas=[perfume_template],
-        ids=[perfume_template["id"]]
-    )
+    add_in_batches(templates_collection, [doc], [perfume_template], [perfume_template["id"]])
     
     print("✅ Added project templates to ChromaDB")
 
@@ -283,44 +309,31 @@ def populate_database_tables():
         conn = psycopg2.connect(os.environ["DATABASE_URL"])
         cur = conn.cursor()
         
-        # Check if data already exists
-        cur.execute("SELECT COUNT(*) FROM agencies")
-        count = cur.fetchone()[0]
+        # Check which tables already have data in a single round trip
+        cur.execute("SELECT (SELECT COUNT(*) FROM agencies), (SELECT COUNT(*) FROM competitors)")
+        agency_count, competitor_count = cur.fetchone()
         
-        if count == 0:
+        if agency_count == 0:
             # Insert sample agencies into PostgreSQL
-            cur.execute("""
+            execute_values(cur, """
                 INSERT INTO agencies (name, service_lines, match_fit_score, key_strengths, 
                                      relevant_experience, availability, budget_comfort_zone, 
                                      team_size, industry_expertise)
-                VALUES 
-                ('DigitalCraft UAE', ARRAY['web development', 'mobile apps'], 0.95, 
-                 ARRAY['React expertise', 'Fast delivery'], '50+ projects', 'Immediate', 
-                 'AED 20,000 - 100,000', 25, ARRAY['retail', 'ecommerce']),
-                ('BrandMasters Dubai', ARRAY['branding', 'design'], 0.92,
-                 ARRAY['Creative excellence'], '100+ brands', '2 weeks',
-                 'AED 15,000 - 80,000', 15, ARRAY['retail', 'fashion'])
-            """)
+                VALUES %s
+            """, SAMPLE_AGENCY_ROWS)
             print("✅ Inserted agencies into PostgreSQL")
         else:
-            print(f"📦 PostgreSQL already has {count} agencies")
-        
-        # Check competitors
-        cur.execute("SELECT COUNT(*) FROM competitors")
-        count = cur.fetchone()[0]
+            print(f"📦 PostgreSQL already has {agency_count} agencies")
         
-        if count == 0:
+        if competitor_count == 0:
             # Insert sample competitors
-            cur.execute("""
+            execute_values(cur, """
                 INSERT INTO competitors (name, location, industry, type, website)
-                VALUES 
-                ('Swiss Arabian', 'Dubai, UAE', 'perfume', 'Direct', 'www.swissarabian.com'),
-                ('Ajmal Perfumes', 'Dubai, UAE', 'perfume', 'Direct', 'www.ajmalperfume.com'),
-                ('Rasasi', 'Dubai, UAE', 'perfume', 'Direct', 'www.rasasi.com')
-            """)
+                VALUES %s
+            """, SAMPLE_COMPETITOR_ROWS)
             print("✅ Inserted competitors into PostgreSQL")
         else:
-            print(f"📦 PostgreSQL already has {count} competitors")
+            print(f"📦 PostgreSQL already has {competitor_count} competitors")
         
         conn.commit()
         cur.close()